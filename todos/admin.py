@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
 from .models import Todo
 
 @admin.register(Todo)
@@ -15,3 +17,22 @@ class TodoAdmin(admin.ModelAdmin):
             'fields': ('due_date', 'created_at', 'updated_at')
         }),
     )
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The changelist only renders list_display; the change form needs every field.
+        match = request.resolver_match
+        changelist = f'{self.opts.app_label}_{self.opts.model_name}_changelist'
+        if match is not None and match.url_name == changelist:
+            queryset = queryset.only(*self.list_display)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        # On PostgreSQL, match against the same tsvector expression that
+        # todo_search_idx indexes so the GIN index replaces two ILIKE scans.
+        if search_term and connections[queryset.db].vendor == 'postgresql':
+            queryset = queryset.annotate(
+                search=SearchVector('title', 'description', config='english'),
+            ).filter(search=SearchQuery(search_term, config='english'))
+            return queryset, False
+        return super().get_search_results(request, queryset, search_term)
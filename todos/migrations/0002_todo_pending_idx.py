@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todos", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="todo",
+            index=models.Index(
+                condition=models.Q(("completed", False)),
+                fields=["-created_at"],
+                name="todo_pending_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    Todo = apps.get_model("todos", "Todo")
+    schema_editor.add_index(
+        Todo,
+        GinIndex(
+            SearchVector("title", "description", config="english"),
+            name="todo_search_idx",
+        ),
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS todo_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todos", "0002_todo_pending_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:00
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+POSTGRESQL_CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION todo_set_updated_at() RETURNS trigger AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at := statement_timestamp();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER todo_set_updated_at
+    BEFORE UPDATE ON todos_todo
+    FOR EACH ROW EXECUTE FUNCTION todo_set_updated_at();
+"""
+
+POSTGRESQL_DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS todo_set_updated_at ON todos_todo;
+DROP FUNCTION IF EXISTS todo_set_updated_at();
+"""
+
+
+# Only PostgreSQL gets a trigger. SQLite rebuilds the table (dropping its
+# triggers) on most schema changes, so there and on other backends
+# Todo.save() and toggle_todo set updated_at from Python instead.
+def create_updated_at_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRESQL_CREATE_TRIGGER, params=None)
+
+
+def drop_updated_at_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRESQL_DROP_TRIGGER, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todos", "0003_todo_search_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="todo",
+            name="created_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(), editable=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="todo",
+            name="updated_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(), editable=False
+            ),
+        ),
+        migrations.RunPython(create_updated_at_trigger, drop_updated_at_trigger),
+    ]
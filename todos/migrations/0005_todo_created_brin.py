@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from django.contrib.postgres.indexes import BrinIndex
+
+    Todo = apps.get_model("todos", "Todo")
+    schema_editor.add_index(
+        Todo, BrinIndex(fields=["created_at"], name="todo_created_brin")
+    )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS todo_created_brin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todos", "0004_db_managed_timestamps"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
@@ -1,16 +1,76 @@
-from django.db import models
+from django.db import connections, models, router
+from django.db.models.functions import Now
 from django.utils import timezone
 
+def db_maintains_updated_at(using):
+    """Return whether the todo_set_updated_at trigger exists on this database.
+
+    Only migration 0004 creates the trigger, and only on PostgreSQL, so a
+    database built without migrations has none. The answer is looked up once
+    per connection and cached on it.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    if not hasattr(connection, 'todo_updated_at_trigger'):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT EXISTS (SELECT 1 FROM pg_trigger '
+                'WHERE tgname = %s AND tgrelid = %s::regclass)',
+                ['todo_set_updated_at', Todo._meta.db_table],
+            )
+            connection.todo_updated_at_trigger = cursor.fetchone()[0]
+    return connection.todo_updated_at_trigger
+
 class Todo(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     due_date = models.DateTimeField(null=True, blank=True)
     completed = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Both timestamps default to NOW() in the database on INSERT. On UPDATE,
+    # updated_at is bumped by the todo_set_updated_at trigger on PostgreSQL
+    # (migration 0004) and from Python everywhere else.
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
+    updated_at = models.DateTimeField(db_default=Now(), editable=False)
+
+    DB_MANAGED_FIELDS = frozenset({'created_at', 'updated_at'})
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Serves the admin's "not completed" filter newest-first.
+            models.Index(
+                fields=['-created_at'],
+                name='todo_pending_idx',
+                condition=models.Q(completed=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        inserting = self._state.adding or self.pk is None or kwargs.get('force_insert')
+        if inserting:
+            if not self._state.adding:
+                # A copied instance (pk reset to None) gets fresh timestamps.
+                for name in self.DB_MANAGED_FIELDS:
+                    setattr(self, name, self._meta.get_field(name).get_default())
+        elif update_fields is not None:
+            # Listing updated_at explicitly is a request to touch the row.
+            touch = 'updated_at' in update_fields
+            update_fields = [
+                name for name in update_fields if name not in self.DB_MANAGED_FIELDS
+            ]
+            if touch or (update_fields and not self._db_maintains_updated_at(kwargs)):
+                self.updated_at = timezone.now()
+                update_fields.append('updated_at')
+            kwargs['update_fields'] = update_fields
+        elif not self._db_maintains_updated_at(kwargs):
+            self.updated_at = timezone.now()
+        super().save(*args, **kwargs)
+
+    def _db_maintains_updated_at(self, save_kwargs):
+        using = save_kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        return db_maintains_updated_at(using)
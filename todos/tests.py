@@ -1,16 +1,43 @@
-from django.test import TestCase, Client
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
-from .models import Todo
+from .forms import TodoForm
+from .models import Todo, db_maintains_updated_at
+from .views import EstimatedCountPaginator
+
+
+def fake_postgresql_lookup(testcase, row):
+    """Make the default connection report PostgreSQL for the rest of the test.
+
+    Only the next cursor (a catalog lookup) is faked and returns ``row``;
+    later queries such as exact counts and page fetches hit the real database.
+    """
+    connection = connections['default']
+    real_cursor = connection.cursor
+    fake_cursor = mock.MagicMock()
+    fake_cursor.__enter__.return_value.fetchone.return_value = row
+    cursors = iter([fake_cursor])
+
+    def cursor(*args, **kwargs):
+        return next(cursors, None) or real_cursor(*args, **kwargs)
+
+    testcase.enterContext(mock.patch.object(connection, 'vendor', 'postgresql'))
+    testcase.enterContext(mock.patch.object(connection, 'cursor', cursor))
+    return fake_cursor
 
 
 class TodoModelTests(TestCase):
     """Test cases for the Todo model."""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Create a test todo."""
-        self.todo = Todo.objects.create(
+        cls.todo = Todo.objects.create(
             title="Test Todo",
             description="This is a test todo",
             due_date=timezone.now() + timedelta(days=1),
@@ -36,11 +63,88 @@ class TodoModelTests(TestCase):
 
     def test_todo_can_be_marked_complete(self):
         """Test that a todo can be marked as completed."""
-        self.todo.completed = True
-        self.todo.save()
+        todo = Todo.objects.get(pk=self.todo.pk)
+        todo.completed = True
+        todo.save()
         refreshed_todo = Todo.objects.get(pk=self.todo.pk)
         self.assertTrue(refreshed_todo.completed)
 
+    def backdate_todo(self):
+        """Push the test todo's updated_at a day into the past and return it."""
+        yesterday = timezone.now() - timedelta(days=1)
+        Todo.objects.filter(pk=self.todo.pk).update(updated_at=yesterday)
+        return yesterday
+
+    def test_todo_save_bumps_updated_at(self):
+        """Test that saving a todo refreshes updated_at but not created_at."""
+        yesterday = self.backdate_todo()
+        todo = Todo.objects.get(pk=self.todo.pk)
+        todo.title = "Renamed Todo"
+        todo.save()
+        refreshed_todo = Todo.objects.get(pk=self.todo.pk)
+        self.assertEqual(refreshed_todo.title, "Renamed Todo")
+        self.assertEqual(refreshed_todo.created_at, self.todo.created_at)
+        self.assertGreater(refreshed_todo.updated_at, yesterday)
+
+    def test_todo_save_updated_at_only_touches(self):
+        """Test that save(update_fields=['updated_at']) still touches the row."""
+        yesterday = self.backdate_todo()
+        todo = Todo.objects.get(pk=self.todo.pk)
+        with self.assertNumQueries(1):
+            todo.save(update_fields=['updated_at'])
+        refreshed_todo = Todo.objects.get(pk=self.todo.pk)
+        self.assertGreater(refreshed_todo.updated_at, yesterday)
+
+    def test_todo_save_skips_deferred_fields(self):
+        """Test that saving a partially loaded todo doesn't fetch deferred fields."""
+        todo = Todo.objects.only('title').get(pk=self.todo.pk)
+        todo.title = "Renamed Todo"
+        with self.assertNumQueries(1):
+            todo.save()
+        refreshed_todo = Todo.objects.get(pk=self.todo.pk)
+        self.assertEqual(refreshed_todo.title, "Renamed Todo")
+        self.assertEqual(refreshed_todo.description, "This is a test todo")
+
+    def test_updated_at_trigger_lookup_is_cached(self):
+        """Test that the PostgreSQL trigger lookup runs once per connection."""
+        connection = connections['default']
+        self.addCleanup(vars(connection).pop, 'todo_updated_at_trigger', None)
+        fake_cursor = fake_postgresql_lookup(self, (True,))
+        self.assertTrue(db_maintains_updated_at('default'))
+        self.assertTrue(db_maintains_updated_at('default'))
+        fake_cursor.__enter__.return_value.execute.assert_called_once()
+
+    def test_missing_updated_at_trigger_bumps_from_python(self):
+        """Test that PostgreSQL without the trigger still gets updated_at bumped."""
+        connection = connections['default']
+        self.addCleanup(vars(connection).pop, 'todo_updated_at_trigger', None)
+        fake_postgresql_lookup(self, (False,))
+        self.assertFalse(db_maintains_updated_at('default'))
+        yesterday = self.backdate_todo()
+        todo = Todo.objects.get(pk=self.todo.pk)
+        todo.save(update_fields=['title'])
+        self.assertGreater(Todo.objects.get(pk=self.todo.pk).updated_at, yesterday)
+
+    def test_todo_copy_inserts_new_row(self):
+        """Test that resetting pk and saving inserts a copy with fresh timestamps."""
+        yesterday = timezone.now() - timedelta(days=1)
+        Todo.objects.filter(pk=self.todo.pk).update(created_at=yesterday, updated_at=yesterday)
+        todo = Todo.objects.get(pk=self.todo.pk)
+        todo.pk = None
+        todo.save()
+        self.assertNotEqual(todo.pk, self.todo.pk)
+        self.assertEqual(Todo.objects.filter(title="Test Todo").count(), 2)
+        copy = Todo.objects.get(pk=todo.pk)
+        self.assertGreater(copy.created_at, yesterday)
+        self.assertGreater(copy.updated_at, yesterday)
+
+    def test_todo_resave_after_delete_inserts_row(self):
+        """Test that saving an instance whose row was deleted inserts it again."""
+        todo = Todo.objects.get(pk=self.todo.pk)
+        Todo.objects.filter(pk=self.todo.pk).delete()
+        todo.save()
+        self.assertTrue(Todo.objects.filter(pk=self.todo.pk, title="Test Todo").exists())
+
     def test_todo_description_is_optional(self):
         """Test that todo description is optional."""
         todo_without_description = Todo.objects.create(
@@ -59,40 +163,50 @@ class TodoModelTests(TestCase):
 class TodoViewTests(TestCase):
     """Test cases for Todo views."""
 
-    def setUp(self):
-        """Set up test client and create test todos."""
-        self.client = Client()
-        self.todo1 = Todo.objects.create(
-            title="Buy groceries",
-            description="Milk, eggs, bread",
-            due_date=timezone.now() + timedelta(days=1),
-            completed=False
-        )
-        self.todo2 = Todo.objects.create(
-            title="Complete project",
-            description="Finish the Django project",
-            completed=True
-        )
+    @classmethod
+    def setUpTestData(cls):
+        """Resolve the list URL and create test todos."""
+        cls.list_url = reverse('todo-list')
+        cls.todo1, cls.todo2 = Todo.objects.bulk_create([
+            Todo(
+                title="Buy groceries",
+                description="Milk, eggs, bread",
+                due_date=timezone.now() + timedelta(days=1),
+                completed=False
+            ),
+            Todo(
+                title="Complete project",
+                description="Finish the Django project",
+                completed=True
+            ),
+        ])
 
     def test_todo_list_view(self):
         """Test that the todo list view displays all todos."""
-        response = self.client.get(reverse('todo-list'))
+        # One COUNT for the paginator and one SELECT for the page.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, "Buy groceries")
-        self.assertContains(response, "Complete project")
+        self.assertIn(b"Buy groceries", response.content)
+        self.assertIn(b"Complete project", response.content)
         self.assertEqual(len(response.context['todos']), 2)
 
     def test_todo_list_view_template(self):
         """Test that the correct template is used for todo list."""
-        response = self.client.get(reverse('todo-list'))
+        response = self.client.get(self.list_url)
         self.assertTemplateUsed(response, 'todos/todo_list.html')
 
+    def test_todo_list_view_paginator_count(self):
+        """Test that the paginator falls back to an exact count off PostgreSQL."""
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.context['paginator'].count, 2)
+
     def test_todo_detail_view(self):
         """Test that the todo detail view displays a single todo."""
         response = self.client.get(reverse('todo-detail', args=[self.todo1.pk]))
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, "Buy groceries")
-        self.assertContains(response, "Milk, eggs, bread")
+        self.assertIn(b"Buy groceries", response.content)
+        self.assertIn(b"Milk, eggs, bread", response.content)
         self.assertEqual(response.context['todo'], self.todo1)
 
     def test_todo_detail_view_template(self):
@@ -100,18 +214,89 @@ class TodoViewTests(TestCase):
         response = self.client.get(reverse('todo-detail', args=[self.todo1.pk]))
         self.assertTemplateUsed(response, 'todos/todo_detail.html')
 
+    def test_todo_detail_view_not_modified(self):
+        """Test that the detail view answers a matching ETag with 304."""
+        url = reverse('todo-detail', args=[self.todo1.pk])
+        response = self.client.get(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_todo_detail_view_modified_after_toggle(self):
+        """Test that a stale ETag gets a full response after the todo changes."""
+        url = reverse('todo-detail', args=[self.todo1.pk])
+        etag = self.client.get(url)['ETag']
+        self.client.post(reverse('todo-toggle', args=[self.todo1.pk]))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
     def test_todo_detail_view_not_found(self):
         """Test that detail view returns 404 for non-existent todo."""
         response = self.client.get(reverse('todo-detail', args=[999]))
         self.assertEqual(response.status_code, 404)
 
 
-class TodoCreateViewTests(TestCase):
-    """Test cases for creating todos."""
-
-    def setUp(self):
-        """Set up test client."""
-        self.client = Client()
+class EstimatedCountPaginatorTests(TestCase):
+    """Test cases for the reltuples-based paginator count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test todos."""
+        Todo.objects.bulk_create([
+            Todo(title="First Todo"),
+            Todo(title="Second Todo"),
+        ])
+
+    def paginator_with_estimate(self, estimate, per_page=10):
+        """Return a paginator whose connection reports a PostgreSQL row estimate."""
+        fake_postgresql_lookup(self, (estimate,))
+        return EstimatedCountPaginator(Todo.objects.order_by('pk'), per_page)
+
+    def test_estimate_used_above_threshold(self):
+        """Test that a large reltuples estimate replaces COUNT(*)."""
+        paginator = self.paginator_with_estimate(50000)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 50000)
+
+    def test_estimate_ignored_below_threshold(self):
+        """Test that a small reltuples estimate falls back to an exact count."""
+        paginator = self.paginator_with_estimate(5)
+        self.assertEqual(paginator.count, 2)
+
+    def test_estimate_ignored_for_filtered_queryset(self):
+        """Test that filtered querysets are always counted exactly."""
+        paginator = EstimatedCountPaginator(Todo.objects.filter(title="First Todo"), 10)
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'):
+            self.assertEqual(paginator.count, 1)
+
+    def test_overshooting_estimate_serves_real_last_page(self):
+        """Test that an empty page past the real rows falls back to the last real page."""
+        paginator = self.paginator_with_estimate(50000, per_page=1)
+        page = paginator.page(5)
+        self.assertEqual(page.number, 2)
+        self.assertEqual([todo.title for todo in page], ["Second Todo"])
+        self.assertEqual(paginator.count, 2)
+
+    def test_undershooting_estimate_reaches_pages_past_estimate(self):
+        """Test that pages past a too-low estimate are still served."""
+        paginator = self.paginator_with_estimate(1, per_page=1)
+        paginator.estimate_threshold = 1
+        page = paginator.page(2)
+        self.assertEqual([todo.title for todo in page], ["Second Todo"])
+        self.assertEqual(paginator.count, 2)
+
+    def test_undershooting_estimate_keeps_next_link(self):
+        """Test that a full last estimated page still reports a next page."""
+        paginator = self.paginator_with_estimate(1, per_page=1)
+        paginator.estimate_threshold = 1
+        page = paginator.page(1)
+        self.assertTrue(page.has_next())
+        self.assertEqual(paginator.num_pages, 2)
+
+
+class TodoFormRenderTests(SimpleTestCase):
+    """Test cases for rendering the todo form without touching the database."""
 
     def test_todo_create_view_get(self):
         """Test that the create view displays the form."""
@@ -120,6 +305,36 @@ class TodoCreateViewTests(TestCase):
         self.assertTemplateUsed(response, 'todos/todo_form.html')
         self.assertIn('form', response.context)
 
+
+class TodoFormTests(SimpleTestCase):
+    """Test cases for TodoForm field parsing."""
+
+    def test_due_date_parses_datetime_local_value(self):
+        """Test that a datetime-local value is parsed into an aware datetime."""
+        form = TodoForm(data={'title': 'Todo', 'due_date': '2030-01-02T03:04'})
+        self.assertTrue(form.is_valid())
+        due_date = form.cleaned_data['due_date']
+        self.assertTrue(timezone.is_aware(due_date))
+        self.assertEqual(
+            (due_date.year, due_date.month, due_date.day, due_date.hour, due_date.minute),
+            (2030, 1, 2, 3, 4)
+        )
+
+    def test_due_date_rejects_invalid_value(self):
+        """Test that an unparseable due date is a validation error."""
+        form = TodoForm(data={'title': 'Todo', 'due_date': 'not a date'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('due_date', form.errors)
+
+
+class TodoCreateViewTests(TestCase):
+    """Test cases for creating todos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Resolve the list URL."""
+        cls.list_url = reverse('todo-list')
+
     def test_todo_create_view_post_success(self):
         """Test that a todo can be created via POST."""
         data = {
@@ -140,7 +355,19 @@ class TodoCreateViewTests(TestCase):
             'completed': False
         }
         response = self.client.post(reverse('todo-create'), data, follow=True)
-        self.assertRedirects(response, reverse('todo-list'))
+        self.assertRedirects(response, self.list_url)
+
+    def test_todo_create_view_post_htmx(self):
+        """Test that an htmx create gets an HX-Redirect header instead of a 302."""
+        data = {
+            'title': 'Htmx Todo',
+            'description': 'Created via htmx',
+            'completed': False
+        }
+        response = self.client.post(reverse('todo-create'), data, HTTP_HX_REQUEST='true')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['HX-Redirect'], self.list_url)
+        self.assertTrue(Todo.objects.filter(title='Htmx Todo').exists())
 
     def test_todo_create_with_due_date(self):
         """Test that a todo can be created with a due date."""
@@ -171,10 +398,11 @@ class TodoCreateViewTests(TestCase):
 class TodoUpdateViewTests(TestCase):
     """Test cases for updating todos."""
 
-    def setUp(self):
-        """Set up test client and create a test todo."""
-        self.client = Client()
-        self.todo = Todo.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        """Resolve the list URL and create a test todo."""
+        cls.list_url = reverse('todo-list')
+        cls.todo = Todo.objects.create(
             title="Original Title",
             description="Original Description",
             completed=False
@@ -185,7 +413,7 @@ class TodoUpdateViewTests(TestCase):
         response = self.client.get(reverse('todo-edit', args=[self.todo.pk]))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'todos/todo_form.html')
-        self.assertContains(response, "Original Title")
+        self.assertIn(b"Original Title", response.content)
 
     def test_todo_update_title(self):
         """Test that a todo's title can be updated."""
@@ -246,16 +474,17 @@ class TodoUpdateViewTests(TestCase):
         response = self.client.post(
             reverse('todo-edit', args=[self.todo.pk]), data, follow=True
         )
-        self.assertRedirects(response, reverse('todo-list'))
+        self.assertRedirects(response, self.list_url)
 
 
 class TodoDeleteViewTests(TestCase):
     """Test cases for deleting todos."""
 
-    def setUp(self):
-        """Set up test client and create a test todo."""
-        self.client = Client()
-        self.todo = Todo.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        """Resolve the list URL and create a test todo."""
+        cls.list_url = reverse('todo-list')
+        cls.todo = Todo.objects.create(
             title="Todo to Delete",
             description="This will be deleted",
             completed=False
@@ -266,7 +495,7 @@ class TodoDeleteViewTests(TestCase):
         response = self.client.get(reverse('todo-delete', args=[self.todo.pk]))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'todos/todo_confirm_delete.html')
-        self.assertContains(response, "Todo to Delete")
+        self.assertIn(b"Todo to Delete", response.content)
 
     def test_todo_delete_view_post(self):
         """Test that a todo can be deleted via POST."""
@@ -280,28 +509,36 @@ class TodoDeleteViewTests(TestCase):
         response = self.client.post(
             reverse('todo-delete', args=[self.todo.pk]), follow=True
         )
-        self.assertRedirects(response, reverse('todo-list'))
+        self.assertRedirects(response, self.list_url)
 
     def test_todo_delete_not_found(self):
         """Test that deleting a non-existent todo returns 404."""
         response = self.client.get(reverse('todo-delete', args=[999]))
         self.assertEqual(response.status_code, 404)
 
+    def test_todo_delete_view_rejects_other_methods(self):
+        """Test that methods other than GET and POST are not allowed."""
+        response = self.client.put(reverse('todo-delete', args=[self.todo.pk]))
+        self.assertEqual(response.status_code, 405)
+        self.assertTrue(Todo.objects.filter(pk=self.todo.pk).exists())
+
+    def test_todo_delete_post_not_found(self):
+        """Test that POSTing a delete for a non-existent todo returns 404."""
+        response = self.client.post(reverse('todo-delete', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
 
 class TodoToggleViewTests(TestCase):
     """Test cases for toggling todo completion status."""
 
-    def setUp(self):
-        """Set up test client and create test todos."""
-        self.client = Client()
-        self.todo_pending = Todo.objects.create(
-            title="Pending Todo",
-            completed=False
-        )
-        self.todo_completed = Todo.objects.create(
-            title="Completed Todo",
-            completed=True
-        )
+    @classmethod
+    def setUpTestData(cls):
+        """Resolve the list URL and create test todos."""
+        cls.list_url = reverse('todo-list')
+        cls.todo_pending, cls.todo_completed = Todo.objects.bulk_create([
+            Todo(title="Pending Todo", completed=False),
+            Todo(title="Completed Todo", completed=True),
+        ])
 
     def test_toggle_pending_to_completed(self):
         """Test that toggling a pending todo marks it as completed."""
@@ -322,9 +559,40 @@ class TodoToggleViewTests(TestCase):
         response = self.client.post(
             reverse('todo-toggle', args=[self.todo_pending.pk]), follow=True
         )
-        self.assertRedirects(response, reverse('todo-list'))
+        self.assertRedirects(response, self.list_url)
 
     def test_toggle_not_found(self):
         """Test that toggling a non-existent todo returns 404."""
         response = self.client.post(reverse('todo-toggle', args=[999]))
         self.assertEqual(response.status_code, 404)
+
+
+class TodoAdminTests(TestCase):
+    """Test cases for the Todo admin."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create an admin user and a test todo."""
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.todo = Todo.objects.create(
+            title="Admin Todo",
+            description="Shown only on the change form"
+        )
+
+    def setUp(self):
+        """Log in as the admin user."""
+        self.client.force_login(self.user)
+
+    def test_changelist_defers_unlisted_fields(self):
+        """Test that the changelist loads only the list_display columns."""
+        response = self.client.get(reverse('admin:todos_todo_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Admin Todo", response.content)
+        todo = response.context['cl'].result_list[0]
+        self.assertIn('description', todo.get_deferred_fields())
+
+    def test_change_form_loads_all_fields(self):
+        """Test that the change form still loads every field."""
+        response = self.client.get(reverse('admin:todos_todo_change', args=[self.todo.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['original'].get_deferred_fields(), set())
@@ -6,6 +6,6 @@ urlpatterns = [
     path('todo/<int:pk>/', views.TodoDetailView.as_view(), name='todo-detail'),
     path('create/', views.TodoCreateView.as_view(), name='todo-create'),
     path('todo/<int:pk>/edit/', views.TodoUpdateView.as_view(), name='todo-edit'),
-    path('todo/<int:pk>/delete/', views.TodoDeleteView.as_view(), name='todo-delete'),
+    path('todo/<int:pk>/delete/', views.delete_todo, name='todo-delete'),
     path('todo/<int:pk>/toggle/', views.toggle_todo, name='todo-toggle'),
 ]
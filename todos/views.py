@@ -1,15 +1,120 @@
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections, router
+from django.db.models import F
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.urls import reverse_lazy
-from .models import Todo
+from .models import Todo, db_maintains_updated_at
 from .forms import TodoForm
 
+TODO_LIST_URL = reverse_lazy('todo-list')
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that reads the planner's row estimate for unfiltered tables.
+
+    On PostgreSQL, COUNT(*) over a whole table is a sequential scan. When the
+    queryset has no WHERE clause and the table is large enough for that to
+    matter, use pg_class.reltuples instead. Everything else (filtered
+    querysets, small tables, other backends) falls back to an exact count.
+
+    An estimate can be off in either direction. If it overshoots, a page past
+    the real rows comes back empty; if it undershoots (e.g. after bulk
+    inserts, before ANALYZE), pages past the estimated end would 404 and the
+    last estimated page would hide its successors. In those cases the
+    paginator recounts exactly, so every real row stays reachable.
+    """
+    estimate_threshold = 10000
+    estimated = False
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        query = getattr(object_list, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[object_list.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                        [object_list.model._meta.db_table],
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] >= self.estimate_threshold:
+                    self.estimated = True
+                    return row[0]
+        return super().count
+
+    def recount(self):
+        """Replace the estimated count with an exact one."""
+        self.estimated = False
+        self.__dict__['count'] = self.object_list.count()
+        self.__dict__.pop('num_pages', None)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.estimated:
+                raise
+            self.recount()
+            return super().validate_number(number)
+
+    def page(self, number):
+        page = super().page(number)
+        if self.estimated and page.number > 1 and not page.object_list:
+            self.recount()
+            page = super().page(self.num_pages)
+        elif (
+            self.estimated
+            and page.number == self.num_pages
+            and len(page.object_list) == self.per_page
+        ):
+            # A full last page may have rows after it; has_next() reads the
+            # paginator, so the recount fixes the page in place.
+            self.recount()
+        return page
+
 class TodoListView(ListView):
     model = Todo
     template_name = 'todos/todo_list.html'
     context_object_name = 'todos'
     paginate_by = 10
+    paginator_class = EstimatedCountPaginator
+
+    def get_queryset(self):
+        # The list template never renders updated_at, so leave it out of the row.
+        return Todo.objects.only(
+            'title', 'description', 'completed', 'due_date', 'created_at'
+        ).order_by('-created_at', '-pk')
+
+def todo_updated_at(request, pk):
+    """Return the todo's updated_at, probed once per request."""
+    if not hasattr(request, '_todo_updated_at'):
+        request._todo_updated_at = (
+            Todo.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        )
+    return request._todo_updated_at
 
+def todo_etag(request, pk):
+    updated_at = todo_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    return f'"{pk}-{updated_at.timestamp()}"'
+
+# The detail template renders every column, so the page can't be narrowed
+# with only(); instead let browsers revalidate and skip rendering on a 304.
+# The ETag carries microseconds so edits within the same second still miss.
+@method_decorator(cache_control(private=True, max_age=0), name='dispatch')
+@method_decorator(
+    condition(etag_func=todo_etag, last_modified_func=todo_updated_at),
+    name='dispatch',
+)
 class TodoDetailView(DetailView):
     model = Todo
     template_name = 'todos/todo_detail.html'
@@ -19,21 +124,38 @@ class TodoCreateView(CreateView):
     model = Todo
     form_class = TodoForm
     template_name = 'todos/todo_form.html'
-    success_url = reverse_lazy('todo-list')
+    success_url = TODO_LIST_URL
+
+    def form_valid(self, form):
+        if self.request.headers.get('HX-Request'):
+            # Let htmx navigate client-side instead of following a 302.
+            self.object = form.save()
+            return HttpResponse(status=204, headers={'HX-Redirect': str(self.success_url)})
+        return super().form_valid(form)
 
 class TodoUpdateView(UpdateView):
     model = Todo
     form_class = TodoForm
     template_name = 'todos/todo_form.html'
-    success_url = reverse_lazy('todo-list')
+    success_url = TODO_LIST_URL
 
-class TodoDeleteView(DeleteView):
-    model = Todo
-    template_name = 'todos/todo_confirm_delete.html'
-    success_url = reverse_lazy('todo-list')
+@require_http_methods(['GET', 'POST'])
+def delete_todo(request, pk):
+    if request.method == 'POST':
+        # No relations or delete signals on Todo, so this is a single DELETE.
+        deleted, _ = Todo.objects.filter(pk=pk).delete()
+        if not deleted:
+            raise Http404('No Todo matches the given query.')
+        return redirect(TODO_LIST_URL)
+    todo = get_object_or_404(Todo.objects.only('title'), pk=pk)
+    return render(request, 'todos/todo_confirm_delete.html', {'todo': todo})
 
 def toggle_todo(request, pk):
-    todo = get_object_or_404(Todo, pk=pk)
-    todo.completed = not todo.completed
-    todo.save()
-    return redirect('todo-list')
+    # Flip the flag in a single UPDATE. Only PostgreSQL bumps updated_at itself.
+    changes = {'completed': ~F('completed')}
+    if not db_maintains_updated_at(router.db_for_write(Todo)):
+        changes['updated_at'] = timezone.now()
+    updated = Todo.objects.filter(pk=pk).update(**changes)
+    if not updated:
+        raise Http404('No Todo matches the given query.')
+    return redirect(TODO_LIST_URL)